@@ -4,7 +4,7 @@ from pathlib import Path
 
 from bids import BIDSLayout
 from bids.exceptions import ConfigError
-from bids.layout import add_config_paths
+from bids.layout import BIDSLayoutIndexer, add_config_paths
 
 from qsipost.bids.config.configurations import CONFIGURATIONS
 
@@ -41,6 +41,8 @@ class QSIPREPLayout(BIDSLayout):
             database_path=database_path,
             reset_database=reset_database,
             config=config_names,
+            # Sidecar metadata is never queried: skip indexing it
+            indexer=BIDSLayoutIndexer(validate=False, index_metadata=False),
         )
         # self.layout = BIDSLayout(
         #     self.path,
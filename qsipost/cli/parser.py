@@ -172,6 +172,15 @@ def _build_parser(**kwargs):
         action="store_true",
         help="Attempt to reduce memory usage (will increase disk usage in working directory)",
     )
+    g_perfm.add_argument(
+        "--use-tmpfs",
+        action="store_true",
+        default=False,
+        help="Keep intermediate results in memory (/dev/shm) instead of the working "
+        "directory. Requires enough shared memory to hold the tractograms. The results "
+        "of the processed subjects are removed after a successful run, and kept for "
+        "a rerun after a failure.",
+    )
     g_perfm.add_argument(
         "--use-plugin",
         "--nipype-plugin-file",
@@ -340,6 +349,13 @@ def _build_parser(**kwargs):
         help="Clears working directory of contents. Use of this flag is not "
         "recommended when running concurrent processes of fMRIPrep.",
     )
+    g_other.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Reuse the anatomical parcellations already stored in the output "
+        "directory instead of rebuilding the anatomical workflow",
+    )
     g_other.add_argument(
         "--resource-monitor",
         action="store_true",
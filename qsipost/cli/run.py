@@ -44,3 +44,13 @@ def main():
         raise e
     else:
         config.loggers.workflow.log(25, "QSIpost finished successfully!")
+        if config.execution.use_tmpfs:
+            from qsipost.workflows.base import clean_tmpfs_dir
+
+            # /dev/shm outlives the process: release the memory once the
+            # derivatives are stored (it is kept on failure, to resume from).
+            clean_tmpfs_dir(
+                config.execution.work_dir,
+                qsipost_wf.name,
+                config.execution.participant_label,
+            )
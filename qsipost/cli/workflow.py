@@ -44,15 +44,16 @@ def build_workflow(config_file: Union[Path, str], retval: dict = {}) -> pe.Workf
         config.execution.layout, config.execution.participant_label, bids_validate=False
     )
 
-    init_message = [
-        "Running QSIPost workflow:",
-        f"QSIprep dataset path: {config.execution.layout.root}",
-        f"Participant list: {subject_list}",
-        f"Run identifier: {config.execution.run_uuid}",
-        f"Output directory: {qsipost_dir}",
-    ]
-
-    build_log.log(25, "\n".join(init_message))
+    init_message = (
+        "Running QSIPost workflow:\n"
+        f"QSIprep dataset path: {config.execution.layout.root}\n"
+        f"Participant list: {subject_list}\n"
+        f"Run identifier: {config.execution.run_uuid}\n"
+        f"Output directory: {qsipost_dir}\n"
+        f"Input hashing method: {config.execution.hash_method}"
+    )
+
+    build_log.log(25, init_message)
 
     retval["workflow"] = init_qsipost_wf()
     config.to_filename(config_file)
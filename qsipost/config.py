@@ -249,6 +249,16 @@ class nipype(_Config):
     """Number of processes (compute tasks) that can be run in parallel (multiprocessing only)."""
     omp_nthreads = None
     """Number of CPUs a single process can access for multithreaded execution."""
+    nthreads_per_tool = {
+        "FitTensor": 2,
+        "EstimateFOD": 8,
+        "Tractography": 4,
+        "TCKSift": 8,
+    }
+    """
+    Number of threads assigned to specific (multithreaded) tools, keyed by interface name.
+    Values are capped by ``omp_nthreads``; tools that are not listed use ``omp_nthreads``.
+    """
     plugin = "MultiProc"
     """NiPype's execution plugin."""
     plugin_args = {
@@ -256,6 +266,13 @@ class nipype(_Config):
         "raise_insufficient": False,
     }
     """Settings for NiPype's execution plugin."""
+    remove_node_directories = False
+    """
+    Remove node working directories once their outputs have been used up.
+    Saves disk space, at the cost of rerunning those nodes on a subsequent run.
+    """
+    remove_unnecessary_outputs = True
+    """Remove node outputs that are not used downstream."""
     resource_monitor = False
     """Enable resource monitor."""
     stop_on_first_crash = True
@@ -274,6 +291,14 @@ class nipype(_Config):
                 out["plugin_args"]["memory_gb"] = float(cls.memory_gb)
         return out
 
+    @classmethod
+    def get_nthreads(cls, tool):
+        """Get the number of threads a given tool (interface class name) should use."""
+        nthreads = cls.omp_nthreads
+        if tool in cls.nthreads_per_tool:
+            nthreads = min(cls.nthreads_per_tool[tool], cls.omp_nthreads)
+        return int(nthreads)
+
     @classmethod
     def init(cls):
         """Set NiPype configurations."""
@@ -300,6 +325,8 @@ class nipype(_Config):
                     "crashfile_format": cls.crashfile_format,
                     "get_linked_libs": cls.get_linked_libs,
                     "stop_on_first_crash": cls.stop_on_first_crash,
+                    "remove_node_directories": cls.remove_node_directories,
+                    "remove_unnecessary_outputs": cls.remove_unnecessary_outputs,
                     "check_version": False,  # disable future telemetry
                 }
             }
@@ -320,12 +347,20 @@ class execution(_Config):
     """Path to the directory containing SQLite database indices for the input QSIPrep dataset."""
     reset_database = False
     """Reset the SQLite database."""
+    resume = False
+    """Reuse anatomical derivatives already present in the output directory."""
     debug = []
     """Debug mode(s)."""
     fs_license_file = _fs_license
     """An existing file containing a FreeSurfer license."""
     fs_subjects_dir = None
     """FreeSurfer's subjects directory."""
+    hash_method = "content"
+    """
+    NiPype's method to hash input files, either ``content`` or ``timestamp``.
+    Hashing on content keeps cached results valid when inputs are re-staged
+    (e.g., by DataLad or rsync) without being modified.
+    """
     layout = None
     """A :py:class:`~qsipost.bids.layout.QSIPrepLayout` object, see :py:func:`init`."""
     log_dir = None
@@ -340,6 +375,11 @@ class execution(_Config):
     """Unique identifier of this particular run."""
     participant_label = None
     """List of participant identifiers that are to be preprocessed."""
+    use_tmpfs = False
+    """
+    Keep the workflow's intermediate results in memory (``/dev/shm``), in a directory
+    keyed on :attr:`work_dir`. A successful run removes its subjects' results.
+    """
     work_dir = Path("work").absolute()
     """Path to a working directory where intermediate results will be available."""
     write_graph = False
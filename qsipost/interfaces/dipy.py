@@ -4,6 +4,8 @@ from nipype.interfaces.dipy.base import (
     DipyDiffusionInterface,
 )
 
+DTI_METRICS = ("tensor", "fa", "ga", "rgb", "md", "ad", "rd", "mode", "evec", "eval")
+
 
 class ReconstDTIInputSpec(DipyBaseInterfaceInputSpec):
     mask_file = File(exists=True, desc="An optional white matter mask")
@@ -21,6 +23,9 @@ class ReconstDTIOutputSpec(TraitedSpec):
     mode_file = File(exists=True, desc="The output mode file")
     evec_file = File(exists=True, desc="The output eigenvectors file")
     eval_file = File(exists=True, desc="The output eigenvalues file")
+    out_files = traits.List(
+        File(exists=True), desc="All of the above files, ordered as in DTI_METRICS"
+    )
 
 
 class ReconstDTI(DipyDiffusionInterface):
@@ -65,18 +70,9 @@ class ReconstDTI(DipyDiffusionInterface):
 
     def _list_outputs(self):
         outputs = self._outputs().get()
-        for metric in [
-            "tensor",
-            "fa",
-            "ga",
-            "rgb",
-            "md",
-            "ad",
-            "rd",
-            "mode",
-            "evec",
-            "eval",
-        ]:
+        outputs["out_files"] = []
+        for metric in DTI_METRICS:
             outputs[f"{metric}_file"] = self._gen_filename(metric)
+            outputs["out_files"].append(outputs[f"{metric}_file"])
 
         return outputs
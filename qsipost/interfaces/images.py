@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import nibabel as nib
+import numpy as np
+from nipype.interfaces.base import (
+    BaseInterfaceInputSpec,
+    File,
+    InputMultiObject,
+    SimpleInterface,
+    TraitedSpec,
+    traits,
+)
+
+
+class _QuantizeImagesInputSpec(BaseInterfaceInputSpec):
+    in_files = InputMultiObject(
+        File(exists=True), mandatory=True, desc="NIfTI images to quantize"
+    )
+    data_dtypes = traits.List(
+        traits.Str,
+        mandatory=True,
+        desc="on-disk data type of each image (a float type leaves it untouched)",
+    )
+
+
+class _QuantizeImagesOutputSpec(TraitedSpec):
+    out_files = traits.List(File(exists=True), desc="quantized images")
+
+
+class QuantizeImages(SimpleInterface):
+    """
+    Store floating-point maps as scaled integers.
+
+    Data are written with the requested integer type, and nibabel picks the
+    ``scl_slope``/``scl_inter`` pair that covers each image's range, so that
+    readers get back (approximately) the original floating-point values.
+    Images whose requested type is not an integer are passed through as-is.
+    """
+
+    input_spec = _QuantizeImagesInputSpec
+    output_spec = _QuantizeImagesOutputSpec
+
+    def _run_interface(self, runtime):
+        if len(self.inputs.in_files) != len(self.inputs.data_dtypes):
+            raise ValueError(
+                "in_files and data_dtypes must have the same number of elements"
+            )
+
+        self._results["out_files"] = []
+        for in_file, data_dtype in zip(self.inputs.in_files, self.inputs.data_dtypes):
+            data_dtype = np.dtype(data_dtype)
+            if not np.issubdtype(data_dtype, np.integer):
+                self._results["out_files"].append(in_file)
+                continue
+            img = nib.load(in_file)
+            data = np.nan_to_num(np.asanyarray(img.dataobj, dtype=np.float32))
+            header = img.header.copy()
+            header.set_data_dtype(data_dtype)
+            out_file = str(Path(runtime.cwd) / Path(in_file).name)
+            img.__class__(data, img.affine, header).to_filename(out_file)
+            self._results["out_files"].append(out_file)
+        return runtime
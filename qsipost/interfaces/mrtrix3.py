@@ -13,6 +13,12 @@ from nipype.interfaces.base import (
     traits,
 )
 from nipype.interfaces.mrtrix3.base import MRTrix3Base, MRTrix3BaseInputSpec
+from nipype.interfaces.mrtrix3.utils import TensorMetrics as _TensorMetrics
+from nipype.interfaces.mrtrix3.utils import (
+    TensorMetricsOutputSpec as _TensorMetricsOutputSpec,
+)
+
+TENSOR_METRICS = ("adc", "fa", "ad", "rd", "cl", "cp", "cs", "evec", "eval")
 
 
 class ResponseSDInputSpec(MRTrix3BaseInputSpec):
@@ -777,3 +783,40 @@ class BuildConnectome(MRTrix3Base):
         if isdefined(self.inputs.out_assignments):
             outputs["out_assignments"] = op.abspath(self.inputs.out_assignments)
         return outputs
+
+
+class TensorMetricsOutputSpec(_TensorMetricsOutputSpec):
+    out_files = traits.List(
+        File(exists=True),
+        desc="all requested metric maps, ordered as in TENSOR_METRICS",
+    )
+
+
+class TensorMetrics(_TensorMetrics):
+    """
+    Compute metrics from tensors, additionally listing all requested maps
+    in a single output (e.g., to feed a DerivativesDataSink directly).
+
+    Example
+    -------
+
+    >>> comp = TensorMetrics()
+    >>> comp.inputs.in_file = 'dti.mif'
+    >>> comp.inputs.out_fa = 'fa.mif'
+    >>> comp.inputs.out_adc = 'adc.mif'
+    >>> comp.run()                                 # doctest: +SKIP
+    """
+
+    output_spec = TensorMetricsOutputSpec
+
+    def _list_outputs(self):
+        # The parent implementation looks up an input for every output, and
+        # there is no ``out_files`` input: list the metric maps here instead.
+        outputs = self.output_spec().get()
+        outputs["out_files"] = []
+        for metric in TENSOR_METRICS:
+            out_file = getattr(self.inputs, f"out_{metric}")
+            if isdefined(out_file):
+                outputs[f"out_{metric}"] = op.abspath(out_file)
+                outputs["out_files"].append(outputs[f"out_{metric}"])
+        return outputs
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from nipype.interfaces import utility as niu
 from nipype.pipeline import engine as pe
 
@@ -8,6 +10,7 @@ from qsipost.workflows.anatomical.procedures.derivatives import init_derivatives
 def init_anatomical_wf(
     name: str = "anatomical_postprocess",
     probseg_threshold: float = 0.01,
+    do_reconall: Optional[bool] = None,
 ):
     """
     Initialize the anatomical postprocessing workflow.
@@ -20,7 +23,12 @@ def init_anatomical_wf(
         The threshold for the probabilistic segmentation, by default 0.01
     name : str, optional
         The name of the workflow, by default "anatomical_postprocess"
+    do_reconall : bool, optional
+        Whether to run FreeSurfer's recon-all, by default
+        ``config.workflow.do_reconall``
     """
+    if do_reconall is None:
+        do_reconall = config.workflow.do_reconall
     from qsipost.workflows.anatomical.procedures.crop_to_gm import init_gm_cropping_wf
     from qsipost.workflows.anatomical.procedures.freesurfer import init_freesurfer_wf
     from qsipost.workflows.anatomical.procedures.register_atlas import (
@@ -54,7 +62,7 @@ def init_anatomical_wf(
         ),
         name="outputnode",
     )
-    if config.workflow.do_reconall:
+    if do_reconall:
         freesurfer_wf = init_freesurfer_wf()
         workflow.connect(
             [
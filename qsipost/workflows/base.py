@@ -1,7 +1,13 @@
-from typing import Union
+from typing import Optional, Union
 
+import hashlib
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from functools import lru_cache, partial
 from pathlib import Path
+from shutil import rmtree
 
 from nipype.interfaces import utility as niu
 from nipype.pipeline import engine as pe
@@ -9,6 +15,7 @@ from packaging.version import Version
 
 from qsipost import config
 from qsipost.bids.layout import QSIPREPLayout
+from qsipost.interfaces import mrtrix3 as mrt
 from qsipost.parcellations.atlases.atlas import Atlas
 from qsipost.workflows.anatomical.anatomical import init_anatomical_wf
 from qsipost.workflows.diffusion.diffusion import init_diffusion_wf
@@ -27,6 +34,12 @@ def init_qsipost_wf(
     """
     Initialize the qsipost workflow.
 
+    Single-subject workflows are built one after the other, in this process
+    (building one takes a fraction of the time needed to start a worker
+    process). As soon as a subject is built, its graph and configuration are
+    written out in a background thread, and all subjects are added to the
+    top-level workflow once ready.
+
     Parameters
     ----------
     layout : QSIPREPLayout
@@ -38,59 +51,205 @@ def init_qsipost_wf(
     """
     parcellation_atlas = config.workflow.parcellation_atlas
     if isinstance(parcellation_atlas, str):
-        parcellation_atlas = Atlas(parcellation_atlas, load_existing=True)
-        if not hasattr(parcellation_atlas, "atlas_nifti_file"):
-            raise ValueError(
-                f"Could not find the atlas {parcellation_atlas.name} in the "
-                "configured atlas directory. Please check the name or initialize "
-                "a corresponding Atlas object."
-            )
+        parcellation_atlas = _load_parcellation_atlas(parcellation_atlas)
 
     ver = Version(config.environment.version)
     qsipost_wf = pe.Workflow(name=f"qsipost_{ver.major}_{ver.minor}_wf")
     qsipost_wf.base_dir = config.execution.work_dir
+    if config.execution.use_tmpfs:
+        # Large intermediates (e.g., unfiltered tractograms) never reach shared storage
+        qsipost_wf.base_dir = get_tmpfs_dir(config.execution.work_dir)
+    qsipost_wf.config["execution"]["hash_method"] = config.execution.hash_method
     # qsipost_wf.base_dir = str(work_dir.resolve())
-    for subject_id in config.execution.participant_label:
-        name = f"single_subject_{subject_id}_wf"
-        # try:
-        single_subject_wf = init_single_subject_wf(
-            subject_id=subject_id,
-            parcellation_atlas=parcellation_atlas,
-        )
-        single_subject_wf.config["execution"]["crashdump_dir"] = str(
-            config.execution.output_dir
-            / f"sub-{subject_id}"
-            / "log"
-            / config.execution.run_uuid
+    output_dir = str(config.execution.output_dir)
+    run_uuid = config.execution.run_uuid
+    build_subject_wf = partial(
+        _build_single_subject_wf,
+        parcellation_atlas=parcellation_atlas,
+        output_dir=output_dir,
+        run_uuid=run_uuid,
+    )
+    emit_subject_wf = partial(
+        _emit_single_subject_wf,
+        graph_dir=str(qsipost_wf.base_dir / qsipost_wf.name)
+        if config.execution.write_graph
+        else None,
+        output_dir=output_dir,
+        run_uuid=run_uuid,
+        config_toml=config.dumps(),
+    )
+    participant_label = config.execution.participant_label
+    subject_workflows = []
+    emit_futures = []
+    # Emitting (graphviz subprocesses, log files) is I/O bound: it runs in
+    # threads, as soon as each subject's workflow is built.
+    with ThreadPoolExecutor() as emit_executor:
+        for subject_id in participant_label:
+            single_subject_wf = build_subject_wf(subject_id)
+            subject_workflows.append(single_subject_wf)
+            emit_futures.append(
+                emit_executor.submit(emit_subject_wf, subject_id, single_subject_wf)
+            )
+    for future in emit_futures:
+        future.result()
+    qsipost_wf.add_nodes(subject_workflows)
+    return qsipost_wf
+
+
+@lru_cache(maxsize=None)
+def _load_parcellation_atlas(name: str) -> Atlas:
+    """
+    Load a configured parcellation atlas (once per name).
+
+    Parameters
+    ----------
+    name : str
+        The name of the atlas.
+
+    Returns
+    -------
+    Atlas
+        The parcellation atlas.
+    """
+    parcellation_atlas = Atlas(name, load_existing=True)
+    if not hasattr(parcellation_atlas, "atlas_nifti_file"):
+        raise ValueError(
+            f"Could not find the atlas {parcellation_atlas.name} in the "
+            "configured atlas directory. Please check the name or initialize "
+            "a corresponding Atlas object."
         )
-        # single_subject_wf.config["execution"]["crashdump_dir"] = str(
-        #     Path(layout.root) / f"sub-{subject_id}/log"
-        # )
-        for node in single_subject_wf._get_all_nodes():
-            node.config = deepcopy(single_subject_wf.config)
-        # single_subject_wf.base_dir = str(work_dir.resolve())
-        qsipost_wf.add_nodes([single_subject_wf])
-        if config.execution.write_graph:
-            wf_to_write = qsipost_wf.get_node(name)
-            wf_to_write.base_dir = str(qsipost_wf.base_dir / qsipost_wf.name)
-            wf_to_write.write_graph(graph2use="colored", format="svg", simple_form=True)
-        log_dir = (
-            config.execution.output_dir
-            / f"sub-{subject_id}"
-            / "log"
-            / config.execution.run_uuid
+    return parcellation_atlas
+
+
+def get_tmpfs_dir(work_dir: Path) -> Path:
+    """
+    Get the in-memory (``/dev/shm``) counterpart of a working directory.
+
+    The directory is keyed on the working directory rather than on the run, so
+    that a rerun (e.g., after a failure) finds the results cached by the
+    previous one. See :func:`clean_tmpfs_dir` for its removal.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The working directory.
+
+    Returns
+    -------
+    Path
+        The directory in which the workflow is run.
+    """
+    key = hashlib.sha1(str(Path(work_dir).absolute()).encode()).hexdigest()[:12]
+    return Path("/dev/shm") / f"qsipost_{key}"
+
+
+def clean_tmpfs_dir(work_dir: Path, workflow_name: str, participant_label: list):
+    """
+    Remove the in-memory results of a (successful) run.
+
+    Runs sharing a working directory (e.g., one job per participant on the same
+    host) share its in-memory counterpart as well: only the given subjects'
+    directories are removed, and parent directories only once empty.
+
+    Parameters
+    ----------
+    work_dir : Path
+        The working directory.
+    workflow_name : str
+        The name of the top-level workflow.
+    participant_label : list
+        The subjects processed by the run.
+    """
+    tmpfs_dir = get_tmpfs_dir(work_dir)
+    workflow_dir = tmpfs_dir / workflow_name
+    for subject_id in participant_label:
+        rmtree(workflow_dir / f"single_subject_{subject_id}_wf", ignore_errors=True)
+    for directory in (workflow_dir, tmpfs_dir):
+        try:
+            directory.rmdir()
+        except OSError:  # still used by another run (or already removed)
+            pass
+
+
+def _emit_single_subject_wf(
+    subject_id: str,
+    single_subject_wf: pe.Workflow,
+    graph_dir: str,
+    output_dir: str,
+    run_uuid: str,
+    config_toml: str,
+):
+    """
+    Write the graph (if requested) and the run configuration of a subject.
+
+    Parameters
+    ----------
+    subject_id : str
+        The subject ID.
+    single_subject_wf : pe.Workflow
+        The single subject workflow.
+    graph_dir : str
+        The directory in which the workflow graph is written, or None to skip it.
+    output_dir : str
+        The output directory of the run.
+    run_uuid : str
+        The unique identifier of the run.
+    config_toml : str
+        The run configuration, formatted as TOML.
+    """
+    if graph_dir is not None:
+        single_subject_wf.base_dir = graph_dir
+        single_subject_wf.write_graph(
+            graph2use="colored", format="svg", simple_form=True
         )
-        log_dir.mkdir(exist_ok=True, parents=True)
-        config.to_filename(log_dir / "qsipost.toml")
-        # except Exception as e:
-        #     if stop_on_first_crash:
-        #         raise e
-        #     else:
-        #         print(
-        #             f"Could not process subject {subject_id}. "
-        #             f"Error: {e}. Skipping..."
-        #         )
-    return qsipost_wf
+    log_dir = Path(output_dir) / f"sub-{subject_id}" / "log" / run_uuid
+    log_dir.mkdir(exist_ok=True, parents=True)
+    (log_dir / config.CONFIG_FILENAME).write_text(config_toml)
+
+
+def _build_single_subject_wf(
+    subject_id: str,
+    parcellation_atlas: Atlas,
+    output_dir: str,
+    run_uuid: str,
+) -> pe.Workflow:
+    """
+    Build and configure the workflow of a single subject.
+
+    Parameters
+    ----------
+    subject_id : str
+        The subject ID.
+    parcellation_atlas : Atlas
+        The parcellation atlas.
+    output_dir : str
+        The output directory of the run.
+    run_uuid : str
+        The unique identifier of the run.
+
+    Returns
+    -------
+    pe.Workflow
+        The single subject workflow.
+    """
+    single_subject_wf = init_single_subject_wf(
+        subject_id=subject_id,
+        parcellation_atlas=parcellation_atlas,
+    )
+    single_subject_wf.config["execution"][
+        "crashdump_dir"
+    ] = f"{output_dir}/sub-{subject_id}/log/{run_uuid}"
+    single_subject_wf.config["execution"]["hash_method"] = config.execution.hash_method
+    # A single snapshot per subject, shared by reference: nodes only read their
+    # config while building, and Nipype merges a private copy into each node
+    # at execution time.
+    subject_config = deepcopy(single_subject_wf.config)
+    for node in single_subject_wf._get_all_nodes():
+        node.config = subject_config
+        if config.nipype.plugin.startswith("SLURM") and node.n_procs > 1:
+            # Mirror the threads accounted by MultiProc in the SLURM allocation
+            node.plugin_args = {"sbatch_args": f"--cpus-per-task={node.n_procs}"}
+    return single_subject_wf
 
 
 def init_single_subject_wf(
@@ -121,7 +280,7 @@ def init_single_subject_wf(
     # )
     # output_dir.mkdir(exist_ok=True, parents=True)
     # workflow.base_dir = str(work_dir.resolve())
-    qsiprep_ver = config.execution.layout.description["PipelineDescription"]["Version"]
+    qsiprep_ver = _get_qsiprep_version(str(config.execution.layout.root))
     name = f"single_subject_{subject_id}_wf"
     workflow = pe.Workflow(name=name)
     workflow.__desc__ = f"""
@@ -131,8 +290,7 @@ def init_single_subject_wf(
     """
 
     qsipost_dir = config.execution.output_dir
-    freesurfer_dir = Path(qsipost_dir).parent / "freesurfer"
-    freesurfer_dir.mkdir(exist_ok=True, parents=True)
+    freesurfer_dir = _get_freesurfer_dir(qsipost_dir)
     anat_only = config.workflow.anat_only
 
     subject_data, sessions_data = collect_data(
@@ -148,7 +306,7 @@ def init_single_subject_wf(
                 "mni_to_native_transform",
                 "gm_probabilistic_segmentation",
                 "atlas_name",
-                "atlas_nifti",
+                "atlas_nifti_file",
                 "atlas_table",
                 "label_column",
                 "subject_id",
@@ -157,47 +315,84 @@ def init_single_subject_wf(
         ),
         name="inputnode_subject",
     )
-    inputnode.inputs.base_directory = qsipost_dir
-    inputnode.inputs.atlas_name = parcellation_atlas.name
-    inputnode.inputs.atlas_nifti_file = parcellation_atlas.atlas_nifti_file
-    inputnode.inputs.atlas_table = parcellation_atlas.description_csv
-    inputnode.inputs.label_column = parcellation_atlas.label_name
-    inputnode.inputs.anatomical_reference = subject_data["anatomical_reference"]
-    inputnode.inputs.anatomical_brain_mask = subject_data["anatomical_brain_mask"]
-    inputnode.inputs.mni_to_native_transform = subject_data["mni_to_native_transform"]
-    inputnode.inputs.gm_probabilistic_segmentation = subject_data[
-        "gm_probabilistic_segmentation"
-    ]
-    inputnode.inputs.subject_id = subject_id
-    inputnode.inputs.freesurfer_dir = str(freesurfer_dir.resolve())
-
-    anatomical_workflow = init_anatomical_wf(
-        name="anatomical_wf",
+    subject_inputs = {
+        "base_directory": qsipost_dir,
+        "atlas_name": parcellation_atlas.name,
+        "atlas_nifti_file": parcellation_atlas.atlas_nifti_file,
+        "atlas_table": parcellation_atlas.description_csv,
+        "label_column": parcellation_atlas.label_name,
+        "anatomical_reference": subject_data["anatomical_reference"],
+        "anatomical_brain_mask": subject_data["anatomical_brain_mask"],
+        "mni_to_native_transform": subject_data["mni_to_native_transform"],
+        "gm_probabilistic_segmentation": subject_data["gm_probabilistic_segmentation"],
+        "subject_id": subject_id,
+        "freesurfer_dir": freesurfer_dir,
+    }
+    # Setting an undeclared field silently adds an attribute that is never
+    # connected (nor hashed as expected): fail fast instead.
+    undeclared_inputs = set(subject_inputs) - set(
+        inputnode.inputs.copyable_trait_names()
     )
-    workflow.connect(
-        [
-            (
-                inputnode,
-                anatomical_workflow,
-                [
-                    ("base_directory", "inputnode.base_directory"),
-                    ("atlas_name", "inputnode.atlas_name"),
-                    ("atlas_nifti_file", "inputnode.atlas_nifti_file"),
-                    ("anatomical_reference", "inputnode.anatomical_reference"),
-                    (
-                        "mni_to_native_transform",
-                        "inputnode.mni_to_native_transform",
-                    ),
-                    (
-                        "gm_probabilistic_segmentation",
-                        "inputnode.gm_probabilistic_segmentation",
-                    ),
-                    ("subject_id", "inputnode.subject_id"),
-                    ("freesurfer_dir", "inputnode.freesurfer_dir"),
-                ],
-            ),
-        ]
+    if undeclared_inputs:
+        raise ValueError(
+            f"Inputs {sorted(undeclared_inputs)} are not fields of {inputnode.name}."
+        )
+    # Set all inputs at once (a single round of trait notifications); paths
+    # shared across subjects (output directory, atlas files) are interned.
+    inputnode.inputs.trait_set(
+        **{
+            field: sys.intern(str(value)) if isinstance(value, (str, Path)) else value
+            for field, value in subject_inputs.items()
+        }
     )
+
+    cached_parcellations = None
+    if config.execution.resume:
+        cached_parcellations = _find_cached_parcellations(
+            qsipost_dir, subject_id, parcellation_atlas.name
+        )
+        # recon-all is part of the anatomical workflow: only skip it if done
+        freesurfer_subject_dir = Path(freesurfer_dir) / subject_id
+        if config.workflow.do_reconall and not freesurfer_subject_dir.is_dir():
+            cached_parcellations = None
+    if cached_parcellations:
+        config.loggers.workflow.info(
+            "Reusing anatomical derivatives of subject %s: %s",
+            subject_id,
+            cached_parcellations,
+        )
+        anatomical_workflow = _init_cached_anatomical_wf(cached_parcellations)
+        # Nothing may be connected to the stand-in (e.g., with anat_only):
+        # add it explicitly so that the subject's workflow is never empty.
+        workflow.add_nodes([inputnode, anatomical_workflow])
+    else:
+        anatomical_workflow = _get_anatomical_wf_template(
+            do_reconall=config.workflow.do_reconall
+        ).clone(name="anatomical_wf")
+        workflow.connect(
+            [
+                (
+                    inputnode,
+                    anatomical_workflow,
+                    [
+                        ("base_directory", "inputnode.base_directory"),
+                        ("atlas_name", "inputnode.atlas_name"),
+                        ("atlas_nifti_file", "inputnode.atlas_nifti_file"),
+                        ("anatomical_reference", "inputnode.anatomical_reference"),
+                        (
+                            "mni_to_native_transform",
+                            "inputnode.mni_to_native_transform",
+                        ),
+                        (
+                            "gm_probabilistic_segmentation",
+                            "inputnode.gm_probabilistic_segmentation",
+                        ),
+                        ("subject_id", "inputnode.subject_id"),
+                        ("freesurfer_dir", "inputnode.freesurfer_dir"),
+                    ],
+                ),
+            ]
+        )
     if anat_only:
         return workflow
     diffusion_workflows = []
@@ -206,6 +401,28 @@ def init_single_subject_wf(
     For each of the {num_sessions} DWI runs found per subject {subject_id},
     the following steps were performed:
     """
+    if config.workflow.do_tractography:
+        # The 5TT image depends on the T1w only: generate it once per subject
+        gen_5tt_node = pe.Node(
+            mrt.Generate5tt(
+                nthreads=config.nipype.get_nthreads("Generate5tt"),
+                algorithm="fsl",
+            ),
+            name="gen_5tt",
+            n_procs=config.nipype.get_nthreads("Generate5tt"),
+        )
+        workflow.connect(
+            [
+                (
+                    inputnode,
+                    gen_5tt_node,
+                    [
+                        ("anatomical_reference", "in_file"),
+                        ("anatomical_brain_mask", "in_mask"),
+                    ],
+                ),
+            ]
+        )
     for session_inputs in sessions_data.values():
         session_workflow = init_diffusion_wf(dwi_data=session_inputs)
         workflow.connect(
@@ -216,8 +433,6 @@ def init_single_subject_wf(
                     [
                         ("base_directory", "inputnode.base_directory"),
                         ("atlas_name", "inputnode.atlas_name"),
-                        ("anatomical_reference", "inputnode.t1w_file"),
-                        ("anatomical_brain_mask", "inputnode.t1w_mask_file"),
                     ],
                 ),
                 (
@@ -237,6 +452,148 @@ def init_single_subject_wf(
             ]
         )
 
+        if config.workflow.do_tractography:
+            workflow.connect(
+                [
+                    (
+                        gen_5tt_node,
+                        session_workflow,
+                        [("out_file", "inputnode.five_tt_file")],
+                    ),
+                ]
+            )
+
         diffusion_workflows.append(session_workflow)
 
     return workflow
+
+
+@lru_cache(maxsize=None)
+def _get_qsiprep_version(qsiprep_dir: str) -> str:
+    """
+    Get the version of QSIprep that generated an input dataset.
+
+    Parameters
+    ----------
+    qsiprep_dir : str
+        The root of the QSIprep dataset.
+
+    Returns
+    -------
+    str
+        The QSIprep version.
+    """
+    description = json.loads(
+        (Path(qsiprep_dir) / "dataset_description.json").read_text()
+    )
+    return description["PipelineDescription"]["Version"]
+
+
+@lru_cache(maxsize=None)
+def _get_freesurfer_dir(qsipost_dir: Path) -> str:
+    """
+    Create (once) and return the FreeSurfer subjects directory.
+
+    Parameters
+    ----------
+    qsipost_dir : Path
+        The qsipost output directory.
+
+    Returns
+    -------
+    str
+        The resolved FreeSurfer subjects directory.
+    """
+    freesurfer_dir = Path(qsipost_dir).parent / "freesurfer"
+    freesurfer_dir.mkdir(exist_ok=True, parents=True)
+    return str(freesurfer_dir.resolve())
+
+
+@lru_cache(maxsize=None)
+def _get_anatomical_wf_template(do_reconall: bool) -> pe.Workflow:
+    """
+    Build the anatomical workflow once per configuration.
+
+    The anatomical workflow has no subject-specific structure (all inputs
+    are provided by the subject's inputnode), so each subject receives a
+    clone of this template instead of rebuilding it from scratch.
+
+    Parameters
+    ----------
+    do_reconall : bool
+        Whether FreeSurfer's recon-all is part of the workflow.
+
+    Returns
+    -------
+    pe.Workflow
+        The (unconnected) anatomical workflow template.
+    """
+    return init_anatomical_wf(name="anatomical_wf_template", do_reconall=do_reconall)
+
+
+def _find_cached_parcellations(
+    qsipost_dir: Path, subject_id: str, atlas_name: str
+) -> Optional[dict]:
+    """
+    Look for the parcellations stored by a previous run of the anatomical workflow.
+
+    Parameters
+    ----------
+    qsipost_dir : Path
+        The qsipost output directory.
+    subject_id : str
+        The subject's label (without the ``sub-`` prefix).
+    atlas_name : str
+        The name of the parcellation atlas.
+
+    Returns
+    -------
+    Optional[dict]
+        The paths to the stored parcellations, keyed by the anatomical
+        workflow's output fields, or None if any of them is missing.
+    """
+    anat_dir = Path(qsipost_dir) / f"sub-{subject_id}" / "anat"
+    candidates = sorted(anat_dir.glob(f"sub-{subject_id}_*_dseg.nii*"))
+    cached_parcellations = {}
+    for field, label in (
+        ("whole_brain_parcellation", "WholeBrain"),
+        ("gm_cropped_parcellation", "GM"),
+    ):
+        matches = [
+            str(candidate)
+            for candidate in candidates
+            if f"_atlas-{atlas_name}_" in candidate.name
+            and f"_label-{label}_" in candidate.name
+        ]
+        if not matches:
+            return None
+        cached_parcellations[field] = matches[0]
+    return cached_parcellations
+
+
+def _init_cached_anatomical_wf(
+    cached_parcellations: dict, name: str = "anatomical_wf"
+) -> pe.Workflow:
+    """
+    Stand in for the anatomical workflow with previously stored outputs.
+
+    Parameters
+    ----------
+    cached_parcellations : dict
+        The stored parcellations, as returned by :func:`_find_cached_parcellations`.
+    name : str, optional
+        The name of the workflow, by default "anatomical_wf"
+
+    Returns
+    -------
+    pe.Workflow
+        A workflow exposing the same ``outputnode`` fields as the anatomical one.
+    """
+    workflow = pe.Workflow(name=name)
+    outputnode = pe.Node(
+        niu.IdentityInterface(fields=list(cached_parcellations)),
+        name="outputnode",
+    )
+    outputnode.inputs.trait_set(**cached_parcellations)
+    workflow.add_nodes([outputnode])
+    return workflow
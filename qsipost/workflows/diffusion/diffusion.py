@@ -50,8 +50,7 @@ def init_diffusion_wf(
                 "whole_brain_t1w_parcellation",
                 "gm_cropped_t1w_parcellation",
                 "dipy_fit_method",
-                "t1w_file",
-                "t1w_mask_file",
+                "five_tt_file",
             ]
         ),
         name="inputnode",
@@ -75,7 +74,6 @@ def init_diffusion_wf(
     )
     coregister_wf = init_coregistration_wf()
     tensor_estimation_wf = init_tensor_estimation_wf()
-    tractography_wf = init_tractography_wf()
     workflow.connect(
         [
             (
@@ -125,6 +123,8 @@ def init_diffusion_wf(
         ]
     )
     if config.workflow.do_tractography:
+        # Only built (and the DWI header read) when tractography is requested
+        tractography_wf = init_tractography_wf(dwi_file=dwi_data["dwi_nifti"])
         workflow.connect(
             [
                 (
@@ -138,8 +138,7 @@ def init_diffusion_wf(
                         ("dwi_bvec", "inputnode.dwi_bvec"),
                         ("dwi_grad", "inputnode.dwi_grad"),
                         ("dwi_mask", "inputnode.dwi_mask"),
-                        ("t1w_file", "inputnode.t1w_file"),
-                        ("t1w_mask_file", "inputnode.t1w_mask_file"),
+                        ("five_tt_file", "inputnode.five_tt_file"),
                     ],
                 ),
             ]
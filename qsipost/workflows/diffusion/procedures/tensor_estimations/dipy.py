@@ -5,7 +5,7 @@ from nipype.interfaces import utility as niu
 from nipype.pipeline import engine as pe
 
 from qsipost.interfaces.bids import DerivativesDataSink
-from qsipost.interfaces.dipy import ReconstDTI
+from qsipost.interfaces.dipy import DTI_METRICS, ReconstDTI
 from qsipost.workflows.diffusion.procedures.tensor_estimations.utils import (
     parcellate_image,
 )
@@ -13,18 +13,7 @@ from qsipost.workflows.diffusion.procedures.utils.derivatives import (
     DIFFUSION_WF_OUTPUT_ENTITIES,
 )
 
-TENSOR_PARAMETERS = [
-    "tensor",
-    "fa",
-    "ga",
-    "rgb",
-    "md",
-    "ad",
-    "rd",
-    "mode",
-    "evec",
-    "eval",
-]
+TENSOR_PARAMETERS = list(DTI_METRICS)
 
 
 def init_dipy_tensor_wf(
@@ -62,18 +51,15 @@ def init_dipy_tensor_wf(
         name="outputnode",
     )
     tensor_wf = pe.Node(interface=ReconstDTI(), name="dipy_tensor_wf")
-    listify_tensor_params = pe.Node(
-        interface=niu.Merge(numinputs=len(TENSOR_PARAMETERS)),
-        name="listify_tensor_params",
-    )
-    ds_tensor_wf = pe.MapNode(
+    # A single sink writes all maps at once, matching ``desc`` element-wise
+    ds_tensor_wf = pe.Node(
         interface=DerivativesDataSink(
             **DIFFUSION_WF_OUTPUT_ENTITIES.get("dti_derived_parameters"),
             reconstruction_software="dipy",
             save_meta=False,
         ),
-        iterfield=["in_file", "desc"],
         name="ds_tensor_wf",
+        run_without_submitting=True,
     )
     ds_tensor_wf.inputs.desc = TENSOR_PARAMETERS
 
@@ -96,14 +82,9 @@ def init_dipy_tensor_wf(
                 [(f"{param}_file", param) for param in TENSOR_PARAMETERS],
             ),
             (
-                outputnode,
-                listify_tensor_params,
-                [(param, f"in{i+1}") for i, param in enumerate(TENSOR_PARAMETERS)],
-            ),
-            (
-                listify_tensor_params,
+                tensor_wf,
                 ds_tensor_wf,
-                [("out", "in_file")],
+                [("out_files", "in_file")],
             ),
             (
                 inputnode,
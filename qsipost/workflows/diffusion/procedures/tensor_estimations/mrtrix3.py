@@ -4,21 +4,26 @@ from nipype.pipeline import engine as pe
 
 from qsipost import config
 from qsipost.interfaces.bids import DerivativesDataSink
+from qsipost.interfaces.images import QuantizeImages
+from qsipost.interfaces.mrtrix3 import TENSOR_METRICS, TensorMetrics
 from qsipost.workflows.diffusion.procedures.utils.derivatives import (
     DIFFUSION_WF_OUTPUT_ENTITIES,
 )
 
-TENSOR_PARAMETERS = [
-    "adc",
-    "fa",
-    "ad",
-    "rd",
-    "cl",
-    "cp",
-    "cs",
-    "evec",
-    "eval",
-]
+TENSOR_PARAMETERS = list(TENSOR_METRICS)
+# On-disk data types of the stored maps: bounded (shape) metrics and
+# diffusivities are written as scaled integers, eigensystems stay float
+TENSOR_DTYPES = {
+    "adc": "uint16",
+    "fa": "int16",
+    "ad": "uint16",
+    "rd": "uint16",
+    "cl": "int16",
+    "cp": "int16",
+    "cs": "int16",
+    "evec": "float32",
+    "eval": "float32",
+}
 
 
 def init_mrtrix3_tensor_wf(name: str = "mrtrix3_tensor_wf") -> pe.Workflow:
@@ -52,27 +57,31 @@ def init_mrtrix3_tensor_wf(name: str = "mrtrix3_tensor_wf") -> pe.Workflow:
         name="outputnode",
     )
     dwi2tensor_wf = pe.Node(
-        interface=mrtrix3.FitTensor(nthreads=config.nipype.omp_nthreads),
+        interface=mrtrix3.FitTensor(nthreads=config.nipype.get_nthreads("FitTensor")),
         name="mrtrix3_tensor_wf",
+        n_procs=config.nipype.get_nthreads("FitTensor"),
     )
     tensor2metric_wf = pe.Node(
-        interface=mrtrix3.TensorMetrics(
+        interface=TensorMetrics(
             **{f"out_{param}": f"{param}.nii.gz" for param in TENSOR_PARAMETERS},
         ),
         name="mrtrix3_tensor2metric_wf",
     )
-    listify_metrics_wf = pe.Node(
-        interface=niu.Merge(len(TENSOR_PARAMETERS)),
-        name="listify_tensor_params",
+    quantize_metrics_wf = pe.Node(
+        interface=QuantizeImages(
+            data_dtypes=[TENSOR_DTYPES[param] for param in TENSOR_PARAMETERS],
+        ),
+        name="quantize_tensor_params",
     )
-    ds_tensor_wf = pe.MapNode(
+    # A single sink writes all maps at once, matching ``desc`` element-wise
+    ds_tensor_wf = pe.Node(
         interface=DerivativesDataSink(
             **DIFFUSION_WF_OUTPUT_ENTITIES.get("dti_derived_parameters"),
             reconstruction_software="mrtrix3",
             save_meta=False,
         ),
-        iterfield=["in_file", "desc"],
         name="ds_tensor_wf",
+        run_without_submitting=True,
     )
     ds_tensor_wf.inputs.desc = TENSOR_PARAMETERS
 
@@ -100,14 +109,14 @@ def init_mrtrix3_tensor_wf(name: str = "mrtrix3_tensor_wf") -> pe.Workflow:
                 [(f"out_{param}", param) for param in TENSOR_PARAMETERS],
             ),
             (
-                outputnode,
-                listify_metrics_wf,
-                [(param, f"in{i+1}") for i, param in enumerate(TENSOR_PARAMETERS)],
+                tensor2metric_wf,
+                quantize_metrics_wf,
+                [("out_files", "in_files")],
             ),
             (
-                listify_metrics_wf,
+                quantize_metrics_wf,
                 ds_tensor_wf,
-                [("out", "in_file")],
+                [("out_files", "in_file")],
             ),
             (
                 inputnode,
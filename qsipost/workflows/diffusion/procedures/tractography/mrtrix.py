@@ -32,26 +32,48 @@ def estimate_tractography_parameters(
     -------
     stepscale : float
         Step size in mm.
-    lenscale_min : int
+    lenscale_min : float
         Minimum length of the tract in mm.
-    lenscale_max : int
+    lenscale_max : float
         Maximum length of the tract in mm.
     """
+    import gzip
+
     import nibabel as nib
 
-    data = nib.load(in_file)
-    pixdim = data.header["pixdim"][1]
-    stepscale = stepscale * pixdim
-    lenscale_min = lenscale_min * pixdim
-    lenscale_max = lenscale_max * pixdim
+    # Only the header is needed: avoid decompressing/mapping the data block
+    if str(in_file).endswith(".gz"):
+        with gzip.open(in_file, "rb") as fobj:
+            header = nib.Nifti1Header.from_fileobj(fobj)
+    else:
+        header = nib.load(in_file, mmap=True).header
+    pixdim = float(header.get_zooms()[0])
+    # Native floats keep the hashes of downstream inputs stable across runs
+    stepscale = float(stepscale * pixdim)
+    lenscale_min = float(lenscale_min * pixdim)
+    lenscale_max = float(lenscale_max * pixdim)
     return stepscale, lenscale_min, lenscale_max
 
 
 def init_mrtrix_tractography_wf(
+    dwi_file: str,
     name="mrtrix_tractography_wf",
 ) -> pe.Workflow:
     """
     Workflow to perform tractography using MRtrix3.
+
+    Parameters
+    ----------
+    dwi_file : str
+        Path to the DWI file, from whose voxel size tractography parameters
+        are estimated once, at build time.
+    name : str, optional
+        The name of the workflow, by default "mrtrix_tractography_wf"
+
+    Notes
+    -----
+    The five-tissue-type image (``inputnode.five_tt_file``) is expected from
+    the caller, so that it is generated once per subject rather than per session.
     """
     workflow = pe.Workflow(name=name)
 
@@ -63,8 +85,7 @@ def init_mrtrix_tractography_wf(
                 "dwi_reference",
                 "dwi_grad",
                 "dwi_mask_file",
-                "t1w_file",
-                "t1w_mask_file",
+                "five_tt_file",
             ]
         ),
         name="inputnode",
@@ -81,7 +102,7 @@ def init_mrtrix_tractography_wf(
     )
     dwi2response_node = pe.Node(
         mrt.ResponseSD(
-            nthreads=config.nipype.omp_nthreads,
+            nthreads=config.nipype.get_nthreads("ResponseSD"),
             algorithm="dhollander",
             wm_file="wm.txt",
             gm_file="gm.txt",
@@ -89,62 +110,42 @@ def init_mrtrix_tractography_wf(
             voxels_file="voxels.mif",
         ),
         name="dwi2response",
+        n_procs=config.nipype.get_nthreads("ResponseSD"),
     )
     dwi2fod_node = pe.Node(
         mrt.EstimateFOD(
-            nthreads=config.nipype.omp_nthreads,
+            nthreads=config.nipype.get_nthreads("EstimateFOD"),
             algorithm="msmt_csd",
         ),
         name="dwi2fod",
+        n_procs=config.nipype.get_nthreads("EstimateFOD"),
     )
     mtnormalise_node = pe.Node(
-        mrt.MTNormalise(nthreads=config.nipype.omp_nthreads),
+        mrt.MTNormalise(nthreads=config.nipype.get_nthreads("MTNormalise")),
         name="mtnormalise",
+        n_procs=config.nipype.get_nthreads("MTNormalise"),
     )
-    gen_5tt_node = pe.Node(
-        mrt.Generate5tt(
-            nthreads=config.nipype.omp_nthreads,
-            algorithm="fsl",
-        ),
-        name="gen_5tt",
-    )
-    estimate_tracts_parameters_node = pe.Node(
-        niu.Function(
-            function=estimate_tractography_parameters,
-            input_names=[
-                "in_file",
-                "stepscale",
-                "lenscale_min",
-                "lenscale_max",
-            ],
-            output_names=["stepscale", "lenscale_min", "lenscale_max"],
-        ),
-        name="estimate_tractography_parameters",
-    )
-    estimate_tracts_parameters_node.inputs.stepscale = config.workflow.stepscale
-    estimate_tracts_parameters_node.inputs.lenscale_min = config.workflow.lenscale_min
-    estimate_tracts_parameters_node.inputs.lenscale_max = config.workflow.lenscale_max
-
     tckgen_node = pe.Node(
         mrt_nipype.Tractography(
-            nthreads=config.nipype.omp_nthreads,
+            nthreads=config.nipype.get_nthreads("Tractography"),
             algorithm=config.workflow.tractography_algorithm,
             select=config.workflow.n_tracts,
             angle=config.workflow.angle,
         ),
         name="tckgen",
+        n_procs=config.nipype.get_nthreads("Tractography"),
     )
-
-    ds_tracts = pe.Node(
-        DerivativesDataSink(
-            suffix="tracts",
-            extension=".tck",
-            desc="unfiltered",
-            reconstruction="mrtrix",
-        ),
-        name="ds_unfiltered_tracts",
-        run_without_submitting=True,
+    (
+        tckgen_node.inputs.step_size,
+        tckgen_node.inputs.min_length,
+        tckgen_node.inputs.max_length,
+    ) = estimate_tractography_parameters(
+        in_file=dwi_file,
+        stepscale=config.workflow.stepscale,
+        lenscale_min=config.workflow.lenscale_min,
+        lenscale_max=config.workflow.lenscale_max,
     )
+
     workflow.connect(
         [
             (
@@ -190,14 +191,6 @@ def init_mrtrix_tractography_wf(
                     ("dwi_mask_file", "in_mask"),
                 ],
             ),
-            (
-                inputnode,
-                gen_5tt_node,
-                [
-                    ("t1w_file", "in_file"),
-                    ("t1w_mask_file", "in_mask"),
-                ],
-            ),
             (
                 mtnormalise_node,
                 tckgen_node,
@@ -205,58 +198,14 @@ def init_mrtrix_tractography_wf(
                     ("out_wm_fod", "in_file"),
                 ],
             ),
-            (
-                inputnode,
-                estimate_tracts_parameters_node,
-                [
-                    ("dwi_file", "in_file"),
-                ],
-            ),
-            (
-                gen_5tt_node,
-                tckgen_node,
-                [
-                    ("out_file", "act_file"),
-                ],
-            ),
-            (
-                estimate_tracts_parameters_node,
-                tckgen_node,
-                [
-                    ("stepscale", "step_size"),
-                    ("lenscale_min", "min_length"),
-                    ("lenscale_max", "max_length"),
-                ],
-            ),
             (
                 inputnode,
                 tckgen_node,
                 [
+                    ("five_tt_file", "act_file"),
                     ("dwi_mask_file", "seed_image"),
                 ],
             ),
-            (
-                tckgen_node,
-                ds_tracts,
-                [
-                    ("out_file", "in_file"),
-                ],
-            ),
-            (
-                inputnode,
-                ds_tracts,
-                [
-                    ("base_directory", "base_directory"),
-                    ("dwi_file", "source_file"),
-                ],
-            ),
-            (
-                ds_tracts,
-                outputnode,
-                [
-                    ("out_file", "unfiltered_tracts"),
-                ],
-            ),
         ]
     )
     in_tracts = "unfiltered_tracts"
@@ -276,11 +225,12 @@ def init_mrtrix_tractography_wf(
             )
         tcksift_node = pe.Node(
             mrt.TCKSift(
-                nthreads=config.nipype.omp_nthreads,
+                nthreads=config.nipype.get_nthreads("TCKSift"),
                 **tcksift_kwargs,
                 fd_scale_gm=True,
             ),
             name="tcksift",
+            n_procs=config.nipype.get_nthreads("TCKSift"),
         )
         ds_tcksift_node = pe.Node(
             DerivativesDataSink(
@@ -309,17 +259,17 @@ def init_mrtrix_tractography_wf(
                     ],
                 ),
                 (
-                    gen_5tt_node,
+                    inputnode,
                     tcksift_node,
                     [
-                        ("out_file", "act_file"),
+                        ("five_tt_file", "act_file"),
                     ],
                 ),
                 (
-                    tcksift_node,
+                    tckgen_node,
                     outputnode,
                     [
-                        ("out_file", "tck_file"),
+                        ("out_file", "unfiltered_tracts"),
                     ],
                 ),
                 (
@@ -346,5 +296,44 @@ def init_mrtrix_tractography_wf(
                 ),
             ]
         )
+    else:
+        # The SIFT-filtered tractogram is the deliverable; only store the
+        # (full-size) unfiltered one when it is the final output.
+        ds_tracts = pe.Node(
+            DerivativesDataSink(
+                suffix="tracts",
+                extension=".tck",
+                desc="unfiltered",
+                reconstruction="mrtrix",
+            ),
+            name="ds_unfiltered_tracts",
+            run_without_submitting=True,
+        )
+        workflow.connect(
+            [
+                (
+                    tckgen_node,
+                    ds_tracts,
+                    [
+                        ("out_file", "in_file"),
+                    ],
+                ),
+                (
+                    inputnode,
+                    ds_tracts,
+                    [
+                        ("base_directory", "base_directory"),
+                        ("dwi_file", "source_file"),
+                    ],
+                ),
+                (
+                    ds_tracts,
+                    outputnode,
+                    [
+                        ("out_file", "unfiltered_tracts"),
+                    ],
+                ),
+            ]
+        )
 
     return workflow
@@ -7,6 +7,7 @@ from qsipost.workflows.diffusion.procedures.tractography.mrtrix import (
 
 
 def init_tractography_wf(
+    dwi_file: str,
     name: str = "tractography_wf",
 ) -> pe.Workflow:
     """
@@ -14,6 +15,8 @@ def init_tractography_wf(
 
     Parameters
     ----------
+    dwi_file : str
+        Path to the DWI file, used to set tractography parameters at build time.
     name : str, optional
         The name of the workflow, by default "tractography_wf"
 
@@ -33,8 +36,7 @@ def init_tractography_wf(
                 "dwi_bval",
                 "dwi_grad",
                 "dwi_mask",
-                "t1w_file",
-                "t1w_mask_file",
+                "five_tt_file",
             ]
         ),
         name="inputnode",
@@ -49,7 +51,7 @@ def init_tractography_wf(
         name="outputnode",
     )
 
-    mrtrix3_tractography_wf = init_mrtrix_tractography_wf()
+    mrtrix3_tractography_wf = init_mrtrix_tractography_wf(dwi_file=dwi_file)
     workflow.connect(
         [
             (
@@ -61,8 +63,7 @@ def init_tractography_wf(
                     ("dwi_reference", "inputnode.dwi_reference"),
                     ("dwi_grad", "inputnode.dwi_grad"),
                     ("dwi_mask", "inputnode.dwi_mask_file"),
-                    ("t1w_file", "inputnode.t1w_file"),
-                    ("t1w_mask_file", "inputnode.t1w_mask_file"),
+                    ("five_tt_file", "inputnode.five_tt_file"),
                 ],
             ),
             (
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from qsipost.bids.layout.layout import QSIPREPLayout
 from qsipost.workflows.utils.queries import QUERIES
 
@@ -9,30 +11,37 @@ def collect_data(
 ):
     """
     Uses pybids to retrieve the input data for a given participant
+
+    The layout is queried once for all of the participant's files, which are
+    then matched against ``queries`` and bucketed (per session) in a single pass.
     """
+    sessions = set()
+    subject_files = defaultdict(list)
+    session_files = defaultdict(lambda: defaultdict(list))
+    for bids_file in layout.get(subject=participant_label):
+        entities = bids_file.get_entities(metadata=False)
+        session = entities.get("session")
+        if session is not None:
+            sessions.add(session)
+        for dtype, query in queries.items():
+            if not _match_entities(entities, query["entities"]):
+                continue
+            if query["scope"] == "subject":
+                subject_files[dtype].append(bids_file.path)
+            elif session is not None:
+                session_files[session][dtype].append(bids_file.path)
+
+    session = None
     try:
         subj_data = {
-            dtype: sorted(
-                layout.get(
-                    return_type="file",
-                    subject=participant_label,
-                    **query["entities"],
-                )
-            )[0]
+            dtype: sorted(subject_files[dtype])[0]
             for dtype, query in queries.items()
             if query["scope"] == "subject"
         }
         session_data = {}
-        for session in layout.get_sessions(subject=participant_label):
+        for session in sorted(sessions):
             session_data[session] = {
-                dtype: sorted(
-                    layout.get(
-                        return_type="file",
-                        subject=participant_label,
-                        session=session,
-                        **query["entities"],
-                    )
-                )[0]
+                dtype: sorted(session_files[session][dtype])[0]
                 for dtype, query in queries.items()
                 if query["scope"] == "session"
             }
@@ -45,3 +54,25 @@ def collect_data(
         )
 
     return subj_data, session_data
+
+
+def _match_entities(entities: dict, query: dict) -> bool:
+    """
+    Check whether a file's entities match those of a query.
+
+    Follows pybids' conventions: a ``None`` value requires the entity to be
+    absent, and extensions match with or without a leading dot.
+    """
+    for entity, value in query.items():
+        if value is None:
+            if entity in entities:
+                return False
+            continue
+        if entity not in entities:
+            return False
+        if entity == "extension":
+            if entities[entity].lstrip(".") != str(value).lstrip("."):
+                return False
+        elif str(entities[entity]) != str(value):
+            return False
+    return True
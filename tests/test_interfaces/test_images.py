@@ -0,0 +1,60 @@
+"""Tests for the image-manipulation interfaces."""
+import nibabel as nib
+import numpy as np
+import pytest
+
+from qsipost.interfaces.images import QuantizeImages
+
+
+@pytest.fixture
+def in_dir(tmp_path, monkeypatch):
+    """Inputs live apart from the interface's working directory."""
+    (tmp_path / "work").mkdir()
+    monkeypatch.chdir(tmp_path / "work")
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    return in_dir
+
+
+def _write(path, data):
+    nib.Nifti1Image(data.astype(np.float32), np.eye(4)).to_filename(str(path))
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    ("data_dtype", "max_value"),
+    [("int16", 1.0), ("uint16", 3e-3)],
+)
+def test_quantize_round_trip(in_dir, data_dtype, max_value):
+    """Scaled integers read back within one quantization step."""
+    data = np.random.default_rng(0).uniform(0, max_value, size=(8, 8, 8))
+    in_file = _write(in_dir / "map.nii.gz", data)
+
+    result = QuantizeImages(in_files=[in_file], data_dtypes=[data_dtype]).run()
+
+    (out_file,) = result.outputs.out_files
+    assert out_file != in_file
+    img = nib.load(out_file)
+    assert img.get_data_dtype() == np.dtype(data_dtype)
+    step = max_value / np.iinfo(data_dtype).max
+    assert np.allclose(img.get_fdata(), data.astype(np.float32), rtol=0, atol=step)
+
+
+def test_quantize_float_passthrough(in_dir):
+    """Images kept as floats are neither rewritten nor copied."""
+    data = np.random.default_rng(0).normal(size=(4, 4, 4, 3))
+    in_file = _write(in_dir / "evec.nii.gz", data)
+    content = (in_dir / "evec.nii.gz").read_bytes()
+
+    result = QuantizeImages(in_files=[in_file], data_dtypes=["float32"]).run()
+
+    assert result.outputs.out_files == [in_file]
+    assert (in_dir / "evec.nii.gz").read_bytes() == content
+
+
+def test_quantize_length_mismatch(in_dir):
+    """Each image needs exactly one data type."""
+    in_file = _write(in_dir / "fa.nii.gz", np.zeros((2, 2, 2)))
+
+    with pytest.raises(ValueError, match="same number of elements"):
+        QuantizeImages(in_files=[in_file], data_dtypes=["int16", "uint16"]).run()
@@ -0,0 +1,28 @@
+"""Tests for the MRtrix3 interfaces."""
+import os.path as op
+
+from nipype.interfaces.base import isdefined
+
+from qsipost.interfaces.mrtrix3 import TENSOR_METRICS, TensorMetrics
+
+
+def test_tensor_metrics_lists_all_requested_maps(tmp_path, monkeypatch):
+    """All requested maps are listed, in ``TENSOR_METRICS`` order."""
+    monkeypatch.chdir(tmp_path)
+    requested = {f"out_{metric}": f"{metric}.nii.gz" for metric in TENSOR_METRICS}
+    outputs = TensorMetrics(**requested)._list_outputs()
+
+    expected = [op.abspath(f"{metric}.nii.gz") for metric in TENSOR_METRICS]
+    assert outputs["out_files"] == expected
+    for metric, out_file in zip(TENSOR_METRICS, expected):
+        assert outputs[f"out_{metric}"] == out_file
+
+
+def test_tensor_metrics_skips_unrequested_maps(tmp_path, monkeypatch):
+    """Maps that were not requested are neither set nor listed."""
+    monkeypatch.chdir(tmp_path)
+    outputs = TensorMetrics(out_fa="fa.nii.gz", out_adc="adc.nii.gz")._list_outputs()
+
+    assert outputs["out_files"] == [op.abspath("adc.nii.gz"), op.abspath("fa.nii.gz")]
+    assert outputs["out_fa"] == op.abspath("fa.nii.gz")
+    assert not isdefined(outputs["out_rd"])
@@ -0,0 +1,52 @@
+"""Fixtures shared by the workflow tests."""
+import json
+
+import pytest
+
+from qsipost.bids.layout import QSIPREPLayout
+
+SUBJECT_FILES = [
+    "anat/sub-01_desc-preproc_T1w.nii.gz",
+    "anat/sub-01_space-MNI152NLin2009cAsym_desc-preproc_T1w.nii.gz",
+    "anat/sub-01_desc-brain_mask.nii.gz",
+    "anat/sub-01_space-MNI152NLin2009cAsym_desc-brain_mask.nii.gz",
+    "anat/sub-01_from-MNI152NLin2009cAsym_to-T1w_mode-image_xfm.h5",
+    "anat/sub-01_from-T1w_to-MNI152NLin2009cAsym_mode-image_xfm.h5",
+    "anat/sub-01_label-GM_probseg.nii.gz",
+    "anat/sub-01_space-MNI152NLin2009cAsym_label-GM_probseg.nii.gz",
+]
+SESSION_FILES = [
+    "dwi/sub-01_ses-{ses}_space-T1w_dwiref.nii.gz",
+    "dwi/sub-01_ses-{ses}_space-T1w_desc-preproc_dwi.nii.gz",
+    "dwi/sub-01_ses-{ses}_space-T1w_desc-preproc_dwi.bval",
+    "dwi/sub-01_ses-{ses}_space-T1w_desc-preproc_dwi.bvec",
+    "dwi/sub-01_ses-{ses}_space-T1w_desc-preproc_dwi.b",
+    "dwi/sub-01_ses-{ses}_space-T1w_desc-brain_mask.nii.gz",
+    "dwi/sub-01_ses-{ses}_space-T1w_desc-eddy_dwi.nii.gz",
+]
+
+
+@pytest.fixture
+def qsiprep_layout(tmp_path):
+    """A minimal QSIPrep derivatives dataset, with one subject and two sessions."""
+    root = tmp_path / "qsiprep"
+    root.mkdir()
+    (root / "dataset_description.json").write_text(
+        json.dumps(
+            {
+                "Name": "QSIPrep output",
+                "BIDSVersion": "1.4.0",
+                "DatasetType": "derivative",
+                "PipelineDescription": {"Name": "qsiprep", "Version": "0.19.0"},
+            }
+        )
+    )
+    paths = [f"sub-01/{path}" for path in SUBJECT_FILES] + [
+        f"sub-01/ses-{ses}/{path.format(ses=ses)}"
+        for ses in ("1", "2")
+        for path in SESSION_FILES
+    ]
+    for path in paths:
+        (root / path).parent.mkdir(parents=True, exist_ok=True)
+        (root / path).touch()
+    return QSIPREPLayout(root)
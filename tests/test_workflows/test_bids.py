@@ -0,0 +1,72 @@
+"""Tests for the collection of a participant's QSIPrep outputs."""
+import pytest
+
+from qsipost.workflows.utils.bids import _match_entities, collect_data
+from qsipost.workflows.utils.queries import QUERIES
+
+
+def _collect_data_per_query(layout, participant_label, queries=QUERIES):
+    """Reference implementation, querying the layout once per file."""
+    subj_data = {
+        dtype: sorted(
+            layout.get(
+                return_type="file", subject=participant_label, **query["entities"]
+            )
+        )[0]
+        for dtype, query in queries.items()
+        if query["scope"] == "subject"
+    }
+    session_data = {
+        session: {
+            dtype: sorted(
+                layout.get(
+                    return_type="file",
+                    subject=participant_label,
+                    session=session,
+                    **query["entities"],
+                )
+            )[0]
+            for dtype, query in queries.items()
+            if query["scope"] == "session"
+        }
+        for session in layout.get_sessions(subject=participant_label)
+    }
+    return subj_data, session_data
+
+
+def test_collect_data_matches_per_query_lookups(qsiprep_layout):
+    """A single pass over the subject's files finds what each query would."""
+    subj_data, session_data = collect_data(qsiprep_layout, "01")
+
+    assert (subj_data, session_data) == _collect_data_per_query(qsiprep_layout, "01")
+    assert subj_data["anatomical_reference"].endswith("sub-01_desc-preproc_T1w.nii.gz")
+    assert subj_data["mni_to_native_transform"].endswith(
+        "sub-01_from-MNI152NLin2009cAsym_to-T1w_mode-image_xfm.h5"
+    )
+    assert sorted(session_data) == ["1", "2"]
+    assert session_data["2"]["dwi_nifti"].endswith(
+        "sub-01_ses-2_space-T1w_desc-preproc_dwi.nii.gz"
+    )
+
+
+def test_collect_data_missing_participant(qsiprep_layout):
+    """Participants without data are reported."""
+    with pytest.raises(Exception, match="No data found for participant 02"):
+        collect_data(qsiprep_layout, "02")
+
+
+@pytest.mark.parametrize(
+    ("entities", "query", "expected"),
+    [
+        ({"suffix": "T1w"}, {"suffix": "T1w", "space": None}, True),
+        ({"suffix": "T1w", "space": "MNI"}, {"suffix": "T1w", "space": None}, False),
+        ({"suffix": "T1w"}, {"suffix": "T1w", "desc": "preproc"}, False),
+        ({"extension": ".h5"}, {"extension": "h5"}, True),
+        ({"extension": "h5"}, {"extension": ".h5"}, True),
+        ({"extension": ".nii.gz"}, {"extension": ".nii"}, False),
+        ({"session": 1}, {"session": "1"}, True),
+    ],
+)
+def test_match_entities(entities, query, expected):
+    """Queries follow pybids' conventions for absent entities and extensions."""
+    assert _match_entities(entities, query) is expected
@@ -0,0 +1,86 @@
+"""Tests for reusing stored anatomical derivatives."""
+from types import SimpleNamespace
+
+import pytest
+
+from qsipost import config
+from qsipost.workflows.base import _find_cached_parcellations, init_single_subject_wf
+
+WHOLE_BRAIN = "sub-01_space-T1w_atlas-brainnetome_res-T1w_label-WholeBrain_dseg.nii.gz"
+GM_CROPPED = "sub-01_space-T1w_atlas-brainnetome_res-T1w_label-GM_dseg.nii.gz"
+MISNAMED = [
+    # Another atlas
+    "sub-01_space-T1w_atlas-schaefer_res-T1w_label-WholeBrain_dseg.nii.gz",
+    "sub-01_space-T1w_atlas-brainnetome2_res-T1w_label-GM_dseg.nii.gz",
+    # Another suffix or label
+    "sub-01_space-T1w_atlas-brainnetome_res-T1w_label-GM_probseg.nii.gz",
+    "sub-01_space-T1w_atlas-brainnetome_res-T1w_label-WholeBrainGM_dseg.nii.gz",
+    # Another subject
+    "sub-011_space-T1w_atlas-brainnetome_res-T1w_label-WholeBrain_dseg.nii.gz",
+]
+
+
+def _touch(anat_dir, filenames):
+    anat_dir.mkdir(parents=True, exist_ok=True)
+    for filename in filenames:
+        (anat_dir / filename).touch()
+
+
+def test_find_cached_parcellations(tmp_path):
+    """Both parcellations of the requested atlas are found."""
+    anat_dir = tmp_path / "sub-01" / "anat"
+    _touch(anat_dir, MISNAMED + [WHOLE_BRAIN, GM_CROPPED])
+
+    assert _find_cached_parcellations(tmp_path, "01", "brainnetome") == {
+        "whole_brain_parcellation": str(anat_dir / WHOLE_BRAIN),
+        "gm_cropped_parcellation": str(anat_dir / GM_CROPPED),
+    }
+
+
+@pytest.mark.parametrize(
+    "filenames",
+    [
+        [],
+        MISNAMED,
+        MISNAMED + [WHOLE_BRAIN],
+        MISNAMED + [GM_CROPPED],
+    ],
+)
+def test_find_cached_parcellations_incomplete(tmp_path, filenames):
+    """Nothing is reused unless both parcellations are stored."""
+    _touch(tmp_path / "sub-01" / "anat", filenames)
+
+    assert _find_cached_parcellations(tmp_path, "01", "brainnetome") is None
+
+
+def test_find_cached_parcellations_no_subject(tmp_path):
+    """Subjects without outputs are not reused."""
+    assert _find_cached_parcellations(tmp_path, "01", "brainnetome") is None
+
+
+def test_resume_anat_only(tmp_path, monkeypatch, qsiprep_layout):
+    """Resuming an anatomical-only run still yields the stored parcellations."""
+    output_dir = tmp_path / "qsipost"
+    anat_dir = output_dir / "sub-01" / "anat"
+    _touch(anat_dir, [WHOLE_BRAIN, GM_CROPPED])
+    monkeypatch.setattr(config.execution, "layout", qsiprep_layout)
+    monkeypatch.setattr(config.execution, "output_dir", output_dir)
+    monkeypatch.setattr(config.execution, "resume", True)
+    monkeypatch.setattr(config.workflow, "anat_only", True)
+    monkeypatch.setattr(config.workflow, "do_reconall", False)
+    atlas = SimpleNamespace(
+        name="brainnetome",
+        atlas_nifti_file=str(tmp_path / "atlas.nii.gz"),
+        description_csv=str(tmp_path / "atlas.csv"),
+        label_name="Label",
+    )
+
+    workflow = init_single_subject_wf(subject_id="01", parcellation_atlas=atlas)
+
+    assert {node.name for node in workflow._graph.nodes()} == {
+        "inputnode_subject",
+        "anatomical_wf",
+    }
+    outputnode = workflow.get_node("anatomical_wf.outputnode")
+    assert outputnode.inputs.whole_brain_parcellation == str(anat_dir / WHOLE_BRAIN)
+    assert outputnode.inputs.gm_cropped_parcellation == str(anat_dir / GM_CROPPED)
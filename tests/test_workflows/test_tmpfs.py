@@ -0,0 +1,26 @@
+"""Tests for the in-memory working directory."""
+from qsipost.workflows import base
+from qsipost.workflows.base import clean_tmpfs_dir, get_tmpfs_dir
+
+
+def test_tmpfs_dir_is_keyed_on_work_dir(tmp_path):
+    """Runs sharing a working directory share its in-memory counterpart."""
+    assert get_tmpfs_dir(tmp_path / "work") == get_tmpfs_dir(tmp_path / "work")
+    assert get_tmpfs_dir(tmp_path / "work") != get_tmpfs_dir(tmp_path / "other")
+
+
+def test_clean_tmpfs_dir_keeps_other_runs(tmp_path, monkeypatch):
+    """Only the run's own subjects are removed, and parents once empty."""
+    tmpfs_dir = tmp_path / "shm"
+    monkeypatch.setattr(base, "get_tmpfs_dir", lambda work_dir: tmpfs_dir)
+    for subject_id in ("01", "02"):
+        node_dir = tmpfs_dir / "qsipost_wf" / f"single_subject_{subject_id}_wf" / "n"
+        node_dir.mkdir(parents=True)
+        (node_dir / "tracts.tck").touch()
+
+    clean_tmpfs_dir(tmp_path / "work", "qsipost_wf", ["01"])
+    assert not (tmpfs_dir / "qsipost_wf" / "single_subject_01_wf").exists()
+    assert (tmpfs_dir / "qsipost_wf" / "single_subject_02_wf").exists()
+
+    clean_tmpfs_dir(tmp_path / "work", "qsipost_wf", ["02"])
+    assert not tmpfs_dir.exists()